@@ -1,7 +1,8 @@
 # HFO detection
 from .hfo.cs_detector import detect_hfo_cs_beta, CSDetector
 from .hfo.hilbert_detector import detect_hfo_hilbert, HilbertDetector
-from .hfo.ll_detector import detect_hfo_ll, LineLengthDetector
+from .hfo.ll_detector import (detect_hfo_ll, detect_hfo_ll_multichannel,
+                              LineLengthDetector)
 from .hfo.rms_detector import detect_hfo_rms, RootMeanSquareDetector
 
 # Spikes
@@ -5,15 +5,28 @@
 
 
 # Std imports
+from multiprocessing.pool import ThreadPool
 
 # Third pary imports
 import numpy as np
-from scipy.signal import butter, filtfilt
+from numpy.lib.stride_tricks import as_strided
 
 # Local imports
-from ...utils.signal_transforms import compute_line_lenght
 from ...utils.thresholds import th_std
 from ...utils.method import Method
+from ...utils.tools import try_jit_decorate, is_jit_available
+
+_JIT_AVAILABLE = is_jit_available()
+
+LINELENGTH_DTYPE = [('event_start', 'int32'),
+                    ('event_stop', 'int32')]
+
+try:
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # numpy < 1.20
+    def sliding_window_view(x, window_shape):
+        return as_strided(x, (len(x) - window_shape + 1, window_shape),
+                          x.strides * 2, writeable=False)
 
 
 def detect_hfo_ll(sig, fs=5000, threshold=3, window_size=100,
@@ -36,8 +49,8 @@ def detect_hfo_ll(sig, fs=5000, threshold=3, window_size=100,
 
     Returns
     -------
-    output: list
-        List of tuples with the following structure:
+    output: np.ndarray
+        Structured array with dtype LINELENGTH_DTYPE, one row per event with
         (event_start, event_stop)
 
     References
@@ -51,53 +64,64 @@ def detect_hfo_ll(sig, fs=5000, threshold=3, window_size=100,
     # Calculate window values for easier operation
     window_increment = int(np.ceil(window_size * window_overlap))
 
-    output = []
+    if _JIT_AVAILABLE:
+        events = _detect_ll_core(np.asarray(sig, dtype=np.float64),
+                                 int(window_size), window_increment,
+                                 float(threshold))
+        event_start = events[:, 0]
+        event_stop = events[:, 1]
+    else:
+        event_start, event_stop = _detect_ll_numpy(sig, int(window_size),
+                                                   window_increment,
+                                                   threshold)
 
-    # Overlapping window
+    # Optional feature calculations can go here
 
-    win_start = 0
-    win_stop = window_size
-    n_windows = int(np.ceil((len(sig) - window_size) / window_increment)) + 1
-    LL = np.empty(n_windows)
-    LL_i = 0
-    while win_start < len(sig):
-        if win_stop > len(sig):
-            win_stop = len(sig)
-
-        LL[LL_i] = compute_line_lenght(sig[int(win_start):int(win_stop)],
-                                       window_size)[0]
-
-        if win_stop == len(sig):
-            break
+    # Write into output
+    output = np.empty(len(event_start), dtype=LINELENGTH_DTYPE)
+    output['event_start'] = event_start
+    output['event_stop'] = event_stop
 
-        win_start += window_increment
-        win_stop += window_increment
-
-        LL_i += 1
+    return output
 
-    # Create threshold
-    det_th = th_std(LL, threshold)
 
-    # Detect
-    LL_idx = 0
-    while LL_idx < len(LL):
-        if LL[LL_idx] >= det_th:
-            event_start = LL_idx * window_increment
-            while LL_idx < len(LL) and LL[LL_idx] >= det_th:
-                LL_idx += 1
-            event_stop = (LL_idx * window_increment) + window_size
+def detect_hfo_ll_multichannel(sigs, fs=5000, threshold=3, window_size=100,
+                               window_overlap=0.25, n_cores=1):
+    """
+    Line-length detection algorithm run over multiple channels. Channels are
+    processed in parallel threads, the line length computation runs without
+    the GIL when numba is available.
 
-            if event_stop > len(sig):
-                event_stop = len(sig)
+    Parameters
+    ----------
+    sigs: np.ndarray
+        2D array with raw data (already filtered if required),
+        shape = (channels, samples)
+    fs: int
+        Sampling frequency
+    threshold: float
+        Number of standard deviations to use as a threshold
+    window_size: int
+        Sliding window size in samples
+    window_overlap: float
+        Fraction of the window overlap (0 to 1)
+    n_cores: int
+        Number of threads to use (default=1)
 
-            # Optional feature calculations can go here
+    Returns
+    -------
+    output: list
+        List with the output of detect_hfo_ll for each channel
+    """
 
-            # Write into output
-            output.append((event_start, event_stop))
+    iter_args = [(sigs[ch], fs, threshold, window_size, window_overlap)
+                 for ch in range(sigs.shape[0])]
 
-            LL_idx += 1
-        else:
-            LL_idx += 1
+    if n_cores > 1:
+        with ThreadPool(n_cores) as work_pool:
+            output = work_pool.starmap(detect_hfo_ll, iter_args)
+    else:
+        output = [detect_hfo_ll(*args) for args in iter_args]
 
     return output
 
@@ -106,8 +130,7 @@ class LineLengthDetector(Method):
 
     algorithm = 'LINELENGTH_DETECTOR'
     version = '1.0.0'
-    dtype = [('event_start', 'int32'),
-             ('event_stop', 'int32')]
+    dtype = LINELENGTH_DTYPE
 
     def __init__(self, **kwargs):
         """
@@ -137,3 +160,157 @@ class LineLengthDetector(Method):
 
         super().__init__(detect_hfo_ll, **kwargs)
         self._event_flag = True
+
+
+# =============================================================================
+# Auxiliary functions
+# =============================================================================
+
+
+def _detect_ll_numpy(sig, window_size, window_increment, threshold):
+    """
+    Line-length detection with numpy operations over all windows.
+
+    Parameters
+    ----------
+    sig: np.ndarray
+        1D array with raw data (already filtered if required)
+    window_size: int
+        Sliding window size in samples
+    window_increment: int
+        Sliding window step in samples
+    threshold: float
+        Number of standard deviations to use as a threshold
+
+    Returns
+    -------
+    event_start: np.ndarray
+        Event start samples
+    event_stop: np.ndarray
+        Event stop samples
+    """
+
+    # Overlapping window line length as strided sums of absolute differences
+    # compute_line_lenght(window, window_size)[0] sums the first
+    # window_size // 2 + 1 differences, the last windows are clipped to the
+    # end of the signal
+    n_windows = int(np.ceil((len(sig) - window_size) / window_increment)) + 1
+    if n_windows < 1:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    span = window_size // 2 + 1
+    diffs = np.abs(np.diff(sig))
+    LL = np.empty(n_windows)
+    n_full = 0
+    if len(diffs) >= span:
+        full_windows = sliding_window_view(diffs, span)[::window_increment]
+        n_full = min(len(full_windows), n_windows)
+        LL[:n_full] = full_windows[:n_full].sum(axis=1)
+    for win_i in range(n_full, n_windows):
+        LL[win_i] = diffs[win_i * window_increment:].sum()
+    LL /= window_size
+
+    # Create threshold
+    det_th = th_std(LL, threshold)
+
+    # Detect
+    above_th = (LL >= det_th).astype(np.int8)
+    edges = np.diff(above_th, prepend=0, append=0)
+    event_start = np.where(edges == 1)[0] * window_increment
+    event_stop = np.minimum(np.where(edges == -1)[0] * window_increment
+                            + window_size, len(sig))
+
+    return event_start, event_stop
+
+
+@try_jit_decorate({'nopython': True, 'nogil': True, 'cache': True})
+def _shift_line_length(sig, line_length, old_start, old_stop, start, stop):
+    """
+    Moves the running sum of absolute differences sig[old_start:old_stop]
+    to sig[start:stop].
+    """
+
+    for i in range(old_stop, stop):
+        line_length += abs(sig[i + 1] - sig[i])
+    for i in range(old_start, start):
+        line_length -= abs(sig[i + 1] - sig[i])
+    return line_length
+
+
+@try_jit_decorate({'nopython': True, 'nogil': True, 'cache': True})
+def _detect_ll_core(sig, window_size, window_increment, threshold):
+    """
+    Line-length detection in two passes. The first pass runs over the signal,
+    computes the window line length as a running sum and accumulates its
+    mean and variance with Welford's online algorithm so the threshold is
+    known as soon as the pass ends. The second pass scans the line length
+    for threshold crossings and emits events.
+
+    Parameters
+    ----------
+    sig: np.ndarray
+        1D float64 array with raw data (already filtered if required)
+    window_size: int
+        Sliding window size in samples
+    window_increment: int
+        Sliding window step in samples
+    threshold: float
+        Number of standard deviations to use as a threshold
+
+    Returns
+    -------
+    events: np.ndarray
+        2D int32 array with (event_start, event_stop) rows
+    """
+
+    n_diff = len(sig) - 1
+    span = window_size // 2 + 1
+    n_windows = int(np.ceil((len(sig) - window_size) / window_increment)) + 1
+    if n_windows < 1:
+        return np.empty((0, 2), dtype=np.int32)
+
+    # Line length and its statistics
+    LL = np.empty(n_windows)
+    ll_mean = 0.
+    ll_m2 = 0.
+    running = 0.
+    win_start = 0
+    win_stop = 0
+    for win_i in range(n_windows):
+        # Windows past the end of the signal (window_overlap > 1) are empty
+        start = min(win_i * window_increment, n_diff)
+        stop = min(start + span, n_diff)
+        running = _shift_line_length(sig, running, win_start, win_stop,
+                                     start, stop)
+        win_start = start
+        win_stop = stop
+        ll = running / window_size
+        LL[win_i] = ll
+        delta = ll - ll_mean
+        ll_mean += delta / (win_i + 1)
+        ll_m2 += delta * (ll - ll_mean)
+
+    # Population std, same as th_std
+    det_th = ll_mean + threshold * np.sqrt(ll_m2 / n_windows)
+
+    # Detect
+    events = np.empty((n_windows // 2 + 1, 2), dtype=np.int32)
+    n_events = 0
+    in_event = False
+    for win_i in range(n_windows):
+        if LL[win_i] >= det_th:
+            if not in_event:
+                events[n_events, 0] = win_i * window_increment
+                in_event = True
+        elif in_event:
+            events[n_events, 1] = min(win_i * window_increment + window_size,
+                                      len(sig))
+            n_events += 1
+            in_event = False
+
+    if in_event:
+        events[n_events, 1] = min(n_windows * window_increment
+                                  + window_size, len(sig))
+        n_events += 1
+
+    return events[:n_events]
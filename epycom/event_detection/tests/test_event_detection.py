@@ -7,12 +7,17 @@
 from math import isclose
 
 # Third pary imports
+import numpy as np
 from scipy.signal import butter, filtfilt
 
 # Local imports
 from epycom.event_detection import BarkmeierDetector
+from epycom.event_detection.hfo.ll_detector import (_detect_ll_core,
+                                                    _detect_ll_numpy)
 
-from epycom.event_detection import (LineLengthDetector,
+from epycom.event_detection import (detect_hfo_ll,
+                                    detect_hfo_ll_multichannel,
+                                    LineLengthDetector,
                                     RootMeanSquareDetector,
                                     HilbertDetector,
                                     CSDetector)
@@ -62,6 +67,64 @@ def test_detect_hfo_ll(create_testing_eeg_data, benchmark):
         assert det[1] == exp_val[1]
 
 
+def test_detect_hfo_ll_core_numpy_match(create_testing_eeg_data):
+    fs = 5000
+    b, a = butter(3, [80 / (fs / 2), 600 / (fs / 2)], 'bandpass')
+    filt_data = filtfilt(b, a, create_testing_eeg_data)
+    window_size = int((1 / 80) * fs)
+
+    # Full signal, signal cut inside the second HFO (tail windows),
+    # non-overlapping windows and windows starting past the signal end
+    cases = [(len(filt_data), 0.25),
+             (35050, 0.25),
+             (len(filt_data), 1),
+             (35136, 1.5)]
+
+    for n_samples, window_overlap in cases:
+        sig = filt_data[:n_samples]
+        window_increment = int(np.ceil(window_size * window_overlap))
+        exp_start, exp_stop = _detect_ll_numpy(sig, window_size,
+                                               window_increment, 3)
+        events = _detect_ll_core(sig, window_size, window_increment, 3.)
+
+        assert len(exp_start) > 0
+        assert np.array_equal(events[:, 0], exp_start)
+        assert np.array_equal(events[:, 1], exp_stop)
+
+    # Signal shorter than one window
+    window_increment = int(np.ceil(window_size * 0.25))
+    exp_start, exp_stop = _detect_ll_numpy(filt_data[:30], window_size,
+                                           window_increment, 3)
+    events = _detect_ll_core(filt_data[:30], window_size, window_increment,
+                             3.)
+    assert len(exp_start) == len(exp_stop) == len(events) == 0
+
+
+def test_detect_hfo_ll_nan():
+    sig = np.random.default_rng(0).standard_normal(5000)
+    sig[2000] = np.nan
+
+    dets = detect_hfo_ll(sig)
+
+    assert len(dets) == 0
+
+
+def test_detect_hfo_ll_multichannel(create_testing_eeg_data):
+    fs = 5000
+    b, a = butter(3, [80 / (fs / 2), 600 / (fs / 2)], 'bandpass')
+    filt_data = filtfilt(b, a, create_testing_eeg_data)
+    window_size = int((1 / 80) * fs)
+    sigs = np.vstack([filt_data, filt_data[::-1], filt_data * 2])
+
+    dets = detect_hfo_ll_multichannel(sigs, fs, window_size=window_size,
+                                      n_cores=2)
+
+    assert len(dets) == len(sigs)
+    for sig, det in zip(sigs, dets):
+        exp_det = detect_hfo_ll(sig, fs, window_size=window_size)
+        assert np.array_equal(det, exp_det)
+
+
 def test_detect_hfo_rms(create_testing_eeg_data, benchmark):
     fs = 5000
     b, a = butter(3, [80 / (fs / 2), 600 / (fs / 2)], 'bandpass')
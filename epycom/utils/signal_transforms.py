@@ -5,13 +5,23 @@
 
 
 # Std imports
+import math
 
 # Third pary imports
 import numpy as np
 import scipy.signal as sig
+import scipy.fft as sp_fft
+from scipy.ndimage import uniform_filter1d
 
 # Local imports
 
+# Window size from which the O(N) running sum of uniform_filter1d beats
+# np.convolve with a short kernel
+_UNIFORM_FILTER_MIN_WINDOW = 16
+
+# Bytes of complex Stockwell transform rows computed at once (typical L2 size)
+_ST_TILE_BYTES = 262144
+
 
 def compute_hilbert_envelope(signal):
     """
@@ -27,7 +37,8 @@ def compute_hilbert_envelope(signal):
     hilbert_envelope: numpy array
         Hilbert envelope transformed signal
     """
-    return np.abs(sig.hilbert(sig.detrend(signal)))
+    signal = sig.detrend(signal)
+    return np.hypot(signal, _hilbert_transform(signal))
 
 
 def compute_hilbert_power(signal):
@@ -44,7 +55,9 @@ def compute_hilbert_power(signal):
     hilbert_power: numpy array
         Hilbert_power transformed signal
     """
-    return np.abs(sig.hilbert(sig.detrend(signal)))**2
+    signal = sig.detrend(signal)
+    hilbert_transform = _hilbert_transform(signal)
+    return signal * signal + hilbert_transform * hilbert_transform
 
 
 def compute_teager_energy(signal):
@@ -61,12 +74,15 @@ def compute_teager_energy(signal):
     teager_energy: numpy array
         Teager energy transformed signal
     """
-    sqr = np.power(signal[1:-1], 2)
-    odd = signal[:-2]
-    even = signal[2:]
-    energy = sqr - odd * even
-    energy = np.append(energy[0], energy)
-    energy = np.append(energy, energy[-1])
+    if len(signal) < 3:
+        raise ValueError(f"Teager energy needs at least 3 samples, "
+                         f"got {len(signal)}")
+
+    energy = np.empty_like(signal)
+    np.multiply(signal[1:-1], signal[1:-1], out=energy[1:-1])
+    energy[1:-1] -= signal[:-2] * signal[2:]
+    energy[0] = energy[1]
+    energy[-1] = energy[-2]
     return energy
 
 
@@ -86,10 +102,8 @@ def compute_rms(signal, window_size=6):
     root_mea_square: numpy array
         Root mean square transformed signal
     """
-    window_size = int(window_size)
-    aux = np.power(signal, 2)
-    window = np.ones(window_size) / float(window_size)
-    return np.sqrt(np.convolve(aux, window, 'same'))
+    # Running sums can fall slightly below zero in flat segments
+    return np.sqrt(np.maximum(compute_stenergy(signal, window_size), 0))
 
 
 def compute_stenergy(signal, window_size=6):
@@ -110,9 +124,12 @@ def compute_stenergy(signal, window_size=6):
         Short time energy transformed signal
     """
     window_size = int(window_size)
-    aux = np.power(signal, 2)
-    window = np.ones(window_size) / float(window_size)
-    return np.convolve(aux, window, 'same')
+    aux = signal * signal
+    if window_size < _UNIFORM_FILTER_MIN_WINDOW or window_size > len(aux):
+        window = np.ones(window_size) / float(window_size)
+        return np.convolve(aux, window, 'same')
+    return uniform_filter1d(aux, window_size, mode='constant',
+                            output=np.result_type(aux, float))
 
 
 def compute_line_lenght(signal, window_size=6):
@@ -133,15 +150,13 @@ def compute_line_lenght(signal, window_size=6):
         Line length transformed signal
     """
     aux = np.abs(np.subtract(signal[1:], signal[:-1]))
-    window = np.ones(window_size) / float(window_size)
-    data = np.convolve(aux, window)
     start = int(np.floor(window_size / 2))
-    stop = int(np.ceil(window_size / 2))
-    return data[start:-stop]
+    return _moving_average(aux, window_size, start, max(len(aux) - 1, 0))
 
 
 def compute_stockwell_transform(signal, fs, min_freq, max_freq, f_fs=1,
-                                factor=1):
+                                factor=1, dtype=complex, backend='numpy',
+                                n_cores=1):
     """
     Calculates Stockwell transform -
     Localization of the Complex Spectrum: The S Transform
@@ -160,6 +175,15 @@ def compute_stockwell_transform(signal, fs, min_freq, max_freq, f_fs=1,
         Maximum frequency of ST
     f_fs: float
         Is the frequency-sampling interval you desire in the ST result
+    dtype: numpy dtype
+        Complex dtype of the result. np.complex64 halves the memory and
+        computes in single precision (default=complex)
+    backend: str
+        'numpy' or 'cupy'. With 'cupy' the FFTs run on the GPU as a single
+        batch, requires CuPy to be installed (default='numpy')
+    n_cores: int
+        Number of cores used by the batched inverse FFTs of the numpy
+        backend, -1 uses all cores (default=1)
 
     Returns
     -------
@@ -178,34 +202,58 @@ def compute_stockwell_transform(signal, fs, min_freq, max_freq, f_fs=1,
 
     samp_rate = 1 / fs
 
-    t = np.linspace(0, len(signal) - 1, len(signal)) * samp_rate
-    spe_nelements = np.int(np.ceil((max_freq - min_freq + 1) / f_fs))
-    f = (min_freq + np.linspace(0, spe_nelements - 1, spe_nelements)
-         * f_fs) / (samp_rate * len(signal))
-
     # Compute the length of the data
     n = len(signal)
 
+    t = np.arange(n) * samp_rate
+    n_rows = int(np.ceil((max_freq - min_freq + 1) / f_fs))
+    f = (min_freq + np.arange(n_rows) * f_fs) / (samp_rate * n)
+
+    # Work in the precision of the requested output
+    real_dtype = np.finfo(dtype).dtype
+    signal = np.asarray(signal).astype(real_dtype, copy=False)
+
+    if backend == 'numpy':
+        xp = np
+        fft_module = sp_fft
+        fft_kwargs = {'workers': n_cores}
+        tile = max(1, _ST_TILE_BYTES // (np.dtype(dtype).itemsize * n))
+    elif backend == 'cupy':
+        import cupy as xp
+        import cupyx.scipy.fft as fft_module
+        fft_kwargs = {}
+        tile = n_rows
+    else:
+        raise RuntimeError(f'Unknown backend "{backend}"')
+
     # Compute FFT's
-    vector_fft = np.fft.fft(signal)
-    vector_fft = np.concatenate((vector_fft, vector_fft))
+    vector_fft = fft_module.fft(xp.asarray(signal))
 
     # Preallocate output matrix
-    st = np.zeros((int(np.ceil((max_freq - min_freq + 1) / f_fs)), n),
-                  dtype=complex)
+    st = xp.zeros((n_rows, n), dtype=dtype)
 
-    # Start computing the S_transform
+    # Start computing the S_transform in tiles of frequency rows small enough
+    # for the intermediate matrices to stay in L2 cache (one tile on GPU)
+    freqs = min_freq + np.arange(n_rows) * f_fs
+    first_row = 0
     if min_freq == 0:
-        st[0, :] = np.mean(signal) * np.ones(n)
-    else:
-        st[0, :] = np.fft.ifft(vector_fft[min_freq:min_freq + n] *
-                               _g_window(n, min_freq, factor))
-
-    for i in np.linspace(f_fs, (max_freq - min_freq), (max_freq - min_freq)):
-        st[int((i - 1) / f_fs + 1), :] = np.fft.ifft(vector_fft[
-                int(min_freq + i):
-                int(min_freq + i + n)]
-            * _g_window(n, min_freq + i, factor))
+        st[0, :] = np.mean(signal)
+        first_row = 1
+
+    time_idx = xp.arange(n)
+    k_squares = _g_window_squares(n, real_dtype, xp)
+    for row_start in range(first_row, n_rows, tile):
+        tile_freqs = freqs[row_start:row_start + tile]
+        # Circularly shifted spectrum for each frequency of the tile
+        idx = xp.asarray(tile_freqs.astype(int))[:, np.newaxis] + time_idx
+        idx %= n
+        st[row_start:row_start + tile] = fft_module.ifft(
+            vector_fft[idx]
+            * _g_window(n, tile_freqs, factor, real_dtype, xp, k_squares),
+            axis=1, **fft_kwargs)
+
+    if backend == 'cupy':
+        st = xp.asnumpy(st)
 
     return st, t, f
 
@@ -214,7 +262,66 @@ def compute_stockwell_transform(signal, fs, min_freq, max_freq, f_fs=1,
 # =============================================================================
 
 
-def _g_window(length, freq, factor):
+def _hilbert_transform(signal):
+    """
+    Hilbert transform (imaginary part of the analytic signal) computed with
+    real FFTs. Gives the same result as np.imag(scipy.signal.hilbert(signal))
+    at roughly half the cost of the complex FFT pair.
+
+    Parameters
+    ----------
+    signal: numpy array
+        1D real signal to be transformed
+
+    Returns
+    -------
+    hilbert_transform: numpy array
+        Hilbert transform of the signal
+    """
+
+    n = len(signal)
+    spectrum = sp_fft.rfft(signal)
+    spectrum *= -1j
+    spectrum[0] = 0
+    if n % 2 == 0:
+        spectrum[-1] = 0
+    return sp_fft.irfft(spectrum, n)
+
+
+def _moving_average(signal, window_size, start, length):
+    """
+    Uniform moving average computed from prefix sums. Returns the same
+    values as np.convolve(signal, np.ones(window_size) / window_size)
+    [start:start + length] in O(N) regardless of the window size. The
+    results differ from np.convolve only by floating point summation
+    order (errors around 1e-12 of the signal magnitude for 1e5 samples).
+
+    Parameters
+    ----------
+    signal: numpy array
+        1D signal to be averaged
+    window_size: int
+        Number of the points of the window
+    start: int
+        First sample of the full convolution to return
+    length: int
+        Number of samples to return
+
+    Returns
+    -------
+    average: numpy array
+        Moving average of the signal
+    """
+
+    cumsum = np.empty(len(signal) + 1, dtype=np.result_type(signal, float))
+    cumsum[0] = 0
+    np.cumsum(signal, out=cumsum[1:])
+    idx = np.arange(start + 1, start + length + 1)
+    return (cumsum[np.minimum(idx, len(signal))]
+            - cumsum[np.maximum(idx - window_size, 0)]) / window_size
+
+
+def _g_window(length, freq, factor, dtype=float, xp=np, k_squares=None):
     """
     Function to compute the Gaussion window for
     function compute_stockwell_transform.
@@ -223,21 +330,66 @@ def _g_window(length, freq, factor):
     ----------
     length: int
         Rhe length of the Gaussian window
-    freq: float
-        The frequency at which to evaluate the window.
+    freq: float | numpy array
+        The frequency (or 1D array of frequencies) at which to evaluate the
+        window.
     factor: int
         The window-width factor
+    dtype: numpy dtype
+        Float dtype of the window (default=float)
+    xp: module
+        Array module the window is created with, numpy or cupy (default=np)
+    k_squares: tuple
+        Output of _g_window_squares for the same length, dtype and array
+        module. Computed when None (default=None)
 
     -----Outputs Returned--------------------------
 
-    gauss-The Gaussian window
+    gauss-The Gaussian window, 2D with one row per frequency when freq is
+    an array
     """
 
-    vector = np.zeros((2, length))
-    vector[0, :] = np.linspace(0, length - 1, length)
-    vector[1, :] = np.linspace(-length, -1, length)
-    vector = np.square(vector)
-    vector = vector * (-factor * 2 * np.square(np.pi) / np.square(freq))
-    gauss = np.sum(np.exp(vector), axis=0)  # Gaussian window
+    if k_squares is None:
+        k_squares = _g_window_squares(length, dtype, xp)
+    k_sq, k_neg_sq = k_squares
+    freq = np.asarray(freq, dtype=float)[..., np.newaxis]
+    scale = xp.asarray((-factor * 2 * math.pi * math.pi
+                        / (freq * freq)).astype(dtype))
+    gauss = k_sq * scale
+    xp.exp(gauss, out=gauss)
+    gauss_neg = k_neg_sq * scale
+    xp.exp(gauss_neg, out=gauss_neg)
+    gauss += gauss_neg  # Gaussian window
 
     return gauss
+
+
+def _g_window_squares(length, dtype=float, xp=np):
+    """
+    Squared positive and negative sample indices shared by all Gaussian
+    windows of the given length.
+
+    Parameters
+    ----------
+    length: int
+        The length of the Gaussian window
+    dtype: numpy dtype
+        Float dtype of the squares (default=float)
+    xp: module
+        Array module the squares are created with, numpy or cupy
+        (default=np)
+
+    Returns
+    -------
+    k_sq: numpy array
+        Squares of 0 ... length - 1
+    k_neg_sq: numpy array
+        Squares of -length ... -1
+    """
+
+    k = xp.arange(length, dtype=dtype)
+    k_sq = k * k
+    k -= length
+    k_neg_sq = k * k
+
+    return k_sq, k_neg_sq
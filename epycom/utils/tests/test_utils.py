@@ -7,7 +7,9 @@
 # Std imports
 
 # Third pary imports
+import pytest
 import numpy as np
+from scipy.signal import hilbert, detrend
 
 # Local imports
 from epycom.utils.data_operations import (calculate_absolute_samples,
@@ -54,6 +56,12 @@ def test_compute_hilbert_envelope(create_testing_data):
             == round(141021.90763537044, 5))
 
 
+def test_compute_hilbert_envelope_prime_length(create_testing_data):
+    sig = create_testing_data[:1009]
+    exp_env = np.abs(hilbert(detrend(sig)))
+    assert np.allclose(compute_hilbert_envelope(sig), exp_env)
+
+
 def test_compute_hilbert_power(create_testing_data):
     assert (round(np.sum(compute_hilbert_power(create_testing_data)), 5)
             == round(499812.84844509006, 5))
@@ -64,6 +72,11 @@ def test_compute_teager_energy(create_testing_data):
             == round(96410.92390890958, 5))
 
 
+def test_compute_teager_energy_short(create_testing_data):
+    with pytest.raises(ValueError):
+        compute_teager_energy(create_testing_data[:2])
+
+
 def test_compute_rms(create_testing_data):
     assert (round(np.sum(compute_rms(create_testing_data)), 5)
             == round(101737.24636480425, 5))
@@ -84,6 +97,42 @@ def test_compute_stockwell_transform(create_testing_data):
     assert round(np.abs(np.sum(np.sum(s))), 5) == round(75000.00000000402, 5)
 
 
+def test_compute_stockwell_transform_batched(create_testing_data):
+    # Short signal so that several frequency rows are computed in one tile
+    sig = create_testing_data[:2000]
+    n = len(sig)
+    s = compute_stockwell_transform(sig, 5000, 0, 300)[0]
+
+    vector_fft = np.fft.fft(sig)
+    k = np.arange(n)
+    exp_s = np.empty((301, n), dtype=complex)
+    exp_s[0] = np.mean(sig)
+    for freq in range(1, 301):
+        gauss = (np.exp(-2 * np.pi ** 2 * k ** 2 / freq ** 2)
+                 + np.exp(-2 * np.pi ** 2 * (k - n) ** 2 / freq ** 2))
+        exp_s[freq] = np.fft.ifft(np.roll(vector_fft, -freq) * gauss)
+
+    assert np.allclose(s, exp_s)
+
+    s = compute_stockwell_transform(sig, 5000, 0, 300, n_cores=2)[0]
+    assert np.allclose(s, exp_s)
+
+
+def test_compute_stockwell_transform_single(create_testing_data):
+    sig = create_testing_data[:2000]
+    s = compute_stockwell_transform(sig, 5000, 80, 600)[0]
+    s_single = compute_stockwell_transform(sig, 5000, 80, 600,
+                                           dtype=np.complex64)[0]
+    assert s_single.dtype == np.complex64
+    assert np.allclose(s_single, s, atol=1e-5)
+
+
+def test_compute_stockwell_transform_backend(create_testing_data):
+    with pytest.raises(RuntimeError):
+        compute_stockwell_transform(create_testing_data[:2000], 5000, 80,
+                                    600, backend='unknown')
+
+
 # ----- Thresholds -----
 def test_th_std(create_testing_data):
     assert (round(th_std(create_testing_data, 3), 5)
@@ -16,3 +16,11 @@ def try_jit_decorate(jit_kwargs):
         return jit(**jit_kwargs)
     except ImportError:
         return lambda x: x
+
+
+def is_jit_available():
+    try:
+        import numba  # noqa: F401
+        return True
+    except ImportError:
+        return False